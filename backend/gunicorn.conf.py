@@ -0,0 +1,10 @@
+# gunicorn -c gunicorn.conf.py app:app
+bind = '0.0.0.0:5000'
+
+
+def post_fork(server, worker):
+    # A freshly forked worker has a single thread, so it can safely fork the
+    # password hashing pool. Starting it here rather than at import also keeps
+    # --preload from sharing one master-owned pool across workers.
+    from app import password_hasher
+    password_hasher.start()
@@ -0,0 +1,108 @@
+"""Password hashing helpers that run off the request thread.
+
+Werkzeug's pbkdf2/scrypt hashes are deliberately slow, so verifying them on a
+Flask worker blocks that worker for the whole computation. ``PasswordHasher``
+pushes the work onto a small process pool with a bounded backlog and reports
+when a stored hash was produced with a different method than the configured
+one so callers can rehash transparently.
+
+Workers are forked where the platform allows it; ``spawn`` and ``forkserver``
+would re-execute the entry script (``app.py``) in every worker. Forking a
+multi-threaded process can leave a child holding a copy of a lock it will
+never see released, so ``start`` must be called by the server entry point
+before it starts any threads: ``python app.py`` does this in ``__main__`` and
+gunicorn does it from the ``post_fork`` hook in ``gunicorn.conf.py``.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the verification backlog is full."""
+
+
+@lru_cache(maxsize=None)
+def hash_prefix(method: Optional[str]) -> str:
+    """Return the normalised method prefix Werkzeug writes for ``method``.
+
+    Werkzeug expands short names such as ``scrypt`` or ``pbkdf2`` into their
+    full parameter string, so the prefix is derived from a throwaway hash.
+    """
+    kwargs = {'method': method} if method else {}
+    return generate_password_hash('', **kwargs).split('$', 1)[0]
+
+
+def hash_password(password: str, method: Optional[str] = None) -> str:
+    kwargs = {'method': method} if method else {}
+    return generate_password_hash(password, **kwargs)
+
+
+def verify_password(pwhash: str, password: str, method: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+    """Check ``password`` and rehash it if ``pwhash`` uses a stale method.
+
+    Returns ``(valid, new_hash)`` where ``new_hash`` is ``None`` unless the
+    password was valid and the stored hash needs upgrading.
+    """
+    if not check_password_hash(pwhash, password):
+        return False, None
+    if pwhash.split('$', 1)[0] != hash_prefix(method):
+        return True, hash_password(password, method)
+    return True, None
+
+
+def _ready() -> bool:
+    return True
+
+
+def _pool_context():
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+class PasswordHasher:
+    """Bounded process pool for password verification."""
+
+    def __init__(self, method: Optional[str] = None, max_workers: int = 2,
+                 max_pending: int = 16, timeout: float = 5.0):
+        self.method = method
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+
+    def start(self):
+        """Fork every worker now, while the calling process is still single-threaded."""
+        if self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_pool_context())
+        # With fork the executor launches all workers on the first submit
+        self._executor.submit(_ready).result()
+
+    def hash(self, password: str) -> str:
+        return hash_password(password, self.method)
+
+    def verify(self, pwhash: str, password: str) -> Tuple[bool, Optional[str]]:
+        """Verify on the pool, raising ``PasswordPoolBusy`` if it is saturated."""
+        if self._executor is None:
+            raise RuntimeError("PasswordHasher.start() was not called; run the app with "
+                               "'python app.py' or gunicorn -c gunicorn.conf.py")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordPoolBusy()
+        try:
+            future = self._executor.submit(verify_password, pwhash, password, self.method)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,174 @@
+"""Rate limiting and admission control primitives.
+
+State lives in process by default. Token buckets can instead be kept in Redis
+(``create_token_bucket`` with a ``redis://`` URL) so limits hold across
+workers; concurrency limits always apply per process.
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+
+class TokenBucketLimiter:
+    """Token buckets keyed by an arbitrary string.
+
+    Each key gets ``capacity`` tokens that refill at ``refill_rate`` tokens per
+    second. ``acquire`` returns ``(allowed, retry_after_seconds)``.
+    """
+
+    def __init__(self, capacity: float, refill_rate: float, max_keys: int = 10000):
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, tokens: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            level, updated = self._buckets.get(key, (self.capacity, now))
+            level = min(self.capacity, level + (now - updated) * self.refill_rate)
+            if level >= tokens:
+                self._buckets[key] = (level - tokens, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[key] = (level, now)
+                allowed, retry_after = False, (tokens - level) / self.refill_rate
+            if len(self._buckets) > self.max_keys:
+                self._evict(now)
+        return allowed, retry_after
+
+    def _evict(self, now: float):
+        """Drop buckets that have refilled completely; they hold no state."""
+        full_after = self.capacity / self.refill_rate
+        for key in [k for k, (_, updated) in self._buckets.items() if now - updated >= full_after]:
+            del self._buckets[key]
+
+
+class RedisTokenBucketLimiter:
+    """Token buckets shared through Redis, with the same interface as ``TokenBucketLimiter``.
+
+    If Redis fails, limits fall back to an in-process bucket so an outage of
+    the limiter backend does not take down the routes it protects.
+    """
+
+    # Uses the server clock so workers on different hosts agree on refill time
+    _SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local tokens = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'level', 'updated')
+local level = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+level = math.min(capacity, level + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry_after = 0
+if level >= tokens then
+  level = level - tokens
+  allowed = 1
+else
+  retry_after = (tokens - level) / rate
+end
+redis.call('HSET', KEYS[1], 'level', tostring(level), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], ttl)
+return {allowed, tostring(retry_after)}
+"""
+
+    def __init__(self, client, capacity: float, refill_rate: float, prefix: str = 'ratelimit',
+                 errors: Tuple[type, ...] = (Exception,)):
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self.prefix = prefix
+        self._ttl_ms = int(math.ceil(self.capacity / self.refill_rate * 1000)) + 1000
+        self._script = client.register_script(self._SCRIPT)
+        self._errors = errors
+        self._fallback = TokenBucketLimiter(capacity, refill_rate)
+
+    def acquire(self, key: str, tokens: float = 1.0) -> Tuple[bool, float]:
+        try:
+            allowed, retry_after = self._script(
+                keys=[f"{self.prefix}:{key}"],
+                args=[self.capacity, self.refill_rate, tokens, self._ttl_ms]
+            )
+        except self._errors as e:
+            print(f"Rate limit backend unavailable, using in-process limits: {e}")
+            return self._fallback.acquire(key, tokens)
+        return bool(allowed), float(retry_after)
+
+
+_redis_clients = {}
+
+
+def create_token_bucket(capacity: float, refill_rate: float, storage_url: Optional[str] = None,
+                        prefix: str = 'ratelimit'):
+    """Build an in-process limiter, or a Redis-backed one when ``storage_url`` is set."""
+    if not storage_url:
+        return TokenBucketLimiter(capacity, refill_rate)
+
+    try:
+        import redis
+    except ImportError as e:
+        raise RuntimeError("RATE_LIMIT_STORAGE_URL is set but the 'redis' package is not installed") from e
+
+    if storage_url not in _redis_clients:
+        # Short timeouts so an unreachable Redis degrades to local limits instead of stalling requests
+        _redis_clients[storage_url] = redis.Redis.from_url(
+            storage_url, socket_timeout=0.25, socket_connect_timeout=0.25
+        )
+    return RedisTokenBucketLimiter(_redis_clients[storage_url], capacity, refill_rate, prefix,
+                                   errors=(redis.RedisError,))
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests with a bounded FIFO wait queue.
+
+    Up to ``max_concurrent`` callers run at once; up to ``max_queue`` more may
+    wait at most ``queue_timeout`` seconds for a slot. Anyone else is rejected
+    immediately so overload fails fast instead of tying up workers. A released
+    slot is handed straight to the oldest waiter, so newcomers cannot jump the
+    queue.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int = 0, queue_timeout: float = 0.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self._active < self.max_concurrent and not self._waiters:
+                self._active += 1
+                return True
+            if len(self._waiters) >= self.max_queue:
+                return False
+            granted = threading.Event()
+            self._waiters.append(granted)
+
+        if granted.wait(self.queue_timeout):
+            return True
+        with self._lock:
+            # release() may have handed over the slot just as the wait timed out
+            if granted.is_set():
+                return True
+            self._waiters.remove(granted)
+            return False
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                # The slot passes to the oldest waiter; the active count is unchanged
+                self._waiters.popleft().set()
+            else:
+                self._active -= 1
+
+    @property
+    def active(self) -> int:
+        return self._active
@@ -7,7 +7,7 @@ import numpy as np
 # Add the backend directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app import app, db, User, Attendance, Grades, Fees, Surveys, Alerts
+from app import app, db, User, Attendance, Grades, Fees, Surveys, Alerts, Outcomes
 
 def seed_database():
     """Seed the database with mock data for demonstration"""
@@ -184,6 +184,26 @@ def seed_database():
                 )
                 db.session.add(survey)
         
+        print("Creating outcome history...")
+        
+        # Historical dropout labels used by train_model.py
+        for student in students:
+            if student.name in ['Rahul Sharma', 'Sneha Singh']:  # High risk students
+                dropout_chance = 0.6
+            elif student.name in ['Priya Patel', 'Vikram Joshi']:  # Medium risk
+                dropout_chance = 0.25
+            else:  # Low risk students
+                dropout_chance = 0.05
+            
+            for semester in semesters:
+                outcome = Outcomes(
+                    student_id=student.id,
+                    semester=semester,
+                    year=2024,
+                    dropped_out=random.random() < dropout_chance
+                )
+                db.session.add(outcome)
+        
         print("Creating alerts data...")
         
         # Create alerts for high-risk students
@@ -235,6 +255,7 @@ def seed_database():
         print(f"   • Grade records: {len(students) * len(semesters) * 5} (avg)")
         print(f"   • Fee records: {len(students) * 3} (avg)")
         print(f"   • Survey responses: {len(students) * 2} (avg)")
+        print(f"   • Outcome records: {len(students) * len(semesters)}")
         print(f"   • Alerts: {len(high_risk_students) + len(medium_risk_students)//2} (approx)")
         
         print("\n🔐 Demo Login Credentials:")
@@ -0,0 +1,269 @@
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import roc_auc_score, log_loss, precision_score, recall_score, accuracy_score
+from sqlalchemy import select, func, case, extract, and_
+from sqlalchemy.orm import aliased
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, Attendance, Grades, Fees, Surveys, Outcomes, DropoutPredictor, student_features
+
+FEATURE_COLUMNS = DropoutPredictor.FEATURE_COLUMNS
+
+
+def training_query(holdout: bool, holdout_mod: int):
+    """One row per student-term outcome with its aggregated features.
+
+    Feature definitions match app.current_term_features. The survey is the
+    latest one completed on or before the outcome was recorded, so answers
+    given after the outcome never leak into its label.
+
+    Students are split into train/validation by ``student_id % holdout_mod``
+    so no student appears on both sides.
+    """
+    attendance = select(
+        Attendance.student_id, Attendance.year,
+        func.avg(Attendance.percentage).label('attendance_percentage')
+    ).group_by(Attendance.student_id, Attendance.year).subquery()
+
+    grades = select(
+        Grades.student_id, Grades.semester, Grades.year,
+        func.avg(Grades.score).label('average_grade')
+    ).group_by(Grades.student_id, Grades.semester, Grades.year).subquery()
+
+    fee_year = extract('year', Fees.due_date)
+    fees = select(
+        Fees.student_id, fee_year.label('year'),
+        func.max(case((Fees.status == 'overdue', 1), else_=0)).label('overdue')
+    ).group_by(Fees.student_id, fee_year).subquery()
+
+    candidate = aliased(Surveys)
+    survey_as_of_outcome = (
+        select(candidate.id)
+        .where(candidate.student_id == Outcomes.student_id, candidate.completed_at <= Outcomes.recorded_at)
+        .order_by(candidate.completed_at.desc(), candidate.id.desc())
+        .limit(1)
+        .correlate(Outcomes)
+        .scalar_subquery()
+    )
+
+    split = (Outcomes.student_id % holdout_mod) == 0
+    return (
+        select(
+            Outcomes.dropped_out,
+            attendance.c.attendance_percentage,
+            grades.c.average_grade,
+            fees.c.overdue,
+            Surveys.responses
+        )
+        .outerjoin(attendance, and_(attendance.c.student_id == Outcomes.student_id,
+                                    attendance.c.year == Outcomes.year))
+        .outerjoin(grades, and_(grades.c.student_id == Outcomes.student_id,
+                                grades.c.semester == Outcomes.semester,
+                                grades.c.year == Outcomes.year))
+        .outerjoin(fees, and_(fees.c.student_id == Outcomes.student_id,
+                              fees.c.year == Outcomes.year))
+        .outerjoin(Surveys, Surveys.id == survey_as_of_outcome)
+        .where(split if holdout else ~split)
+        .order_by(Outcomes.id)
+    )
+
+
+class OutcomeIterator(xgb.DataIter):
+    """Streams feature chunks from the database into XGBoost.
+
+    XGBoost may iterate more than once while building the quantile sketch, so
+    ``reset`` simply re-runs the query.
+    """
+
+    def __init__(self, query, chunk_size: int):
+        super().__init__()
+        self.query = query
+        self.chunk_size = chunk_size
+        self._extractor = DropoutPredictor()
+        self._result = None
+        self._chunks = None
+
+    def next(self, input_data) -> bool:
+        if self._chunks is None:
+            self._result = db.session.execute(self.query.execution_options(yield_per=self.chunk_size))
+            self._chunks = self._result.partitions()
+
+        rows = next(self._chunks, None)
+        if rows is None:
+            return False
+
+        X = np.array([
+            self._extractor._extract_features(student_features(
+                row.attendance_percentage,
+                row.average_grade,
+                'overdue' if row.overdue else None,
+                row.responses
+            ))
+            for row in rows
+        ], dtype=np.float32)
+        y = np.array([1 if row.dropped_out else 0 for row in rows], dtype=np.float32)
+        input_data(data=X, label=y, feature_names=FEATURE_COLUMNS)
+        return True
+
+    def reset(self):
+        if self._result is not None:
+            self._result.close()
+        self._result = None
+        self._chunks = None
+
+
+def count_rows(holdout: bool, holdout_mod: int) -> int:
+    split = (Outcomes.student_id % holdout_mod) == 0
+    return db.session.scalar(select(func.count(Outcomes.id)).where(split if holdout else ~split))
+
+
+def evaluate(booster: xgb.Booster, dval: xgb.DMatrix) -> dict:
+    y_true = dval.get_label()
+    y_prob = booster.predict(dval)
+    y_pred = (y_prob > 0.5).astype(int)
+
+    metrics = {
+        'accuracy': float(accuracy_score(y_true, y_pred)),
+        'precision': float(precision_score(y_true, y_pred, zero_division=0)),
+        'recall': float(recall_score(y_true, y_pred, zero_division=0)),
+        'positive_rate': float(y_true.mean())
+    }
+    # AUC and log loss are undefined when the holdout contains a single class
+    if len(np.unique(y_true)) > 1:
+        metrics['auc'] = float(roc_auc_score(y_true, y_prob))
+        metrics['logloss'] = float(log_loss(y_true, y_prob))
+    return metrics
+
+
+def train(args):
+    model_dir = args.output_dir or app.config['MODEL_DIR']
+    train_rows = count_rows(False, args.holdout_mod)
+    val_rows = count_rows(True, args.holdout_mod)
+    if train_rows == 0:
+        sys.exit("No training outcomes found in the database")
+
+    print(f"Streaming {train_rows} training rows and {val_rows} validation rows in chunks of {args.chunk_size}...")
+
+    dtrain = xgb.QuantileDMatrix(
+        OutcomeIterator(training_query(False, args.holdout_mod), args.chunk_size),
+        max_bin=args.max_bin
+    )
+    dval = None
+    evals = [(dtrain, 'train')]
+    if val_rows:
+        dval = xgb.QuantileDMatrix(
+            OutcomeIterator(training_query(True, args.holdout_mod), args.chunk_size),
+            ref=dtrain
+        )
+        evals.append((dval, 'validation'))
+
+    base_model = None
+    resumed_from = None
+    if args.resume_from:
+        resumed_from = args.resume_from
+        if resumed_from == 'latest':
+            with open(os.path.join(model_dir, 'LATEST')) as f:
+                resumed_from = f.read().strip()
+        base = DropoutPredictor(model_dir)
+        base.load_version(resumed_from)
+        base_model = base.model
+        print(f"Continuing training from model {resumed_from}")
+
+    params = {
+        'objective': 'binary:logistic',
+        'eval_metric': ['logloss', 'auc'],
+        'tree_method': 'hist',
+        'max_depth': args.max_depth,
+        'eta': args.learning_rate,
+        'subsample': args.subsample,
+        'nthread': args.n_jobs,
+        'seed': 42
+    }
+
+    started = datetime.utcnow()
+    booster = xgb.train(
+        params,
+        dtrain,
+        num_boost_round=args.rounds,
+        evals=evals,
+        early_stopping_rounds=args.early_stopping if dval is not None and args.early_stopping else None,
+        xgb_model=base_model,
+        verbose_eval=args.verbose_eval
+    )
+    elapsed = (datetime.utcnow() - started).total_seconds()
+
+    best_iteration = getattr(booster, 'best_iteration', None)
+    if best_iteration is not None:
+        # Early stopping keeps the trailing rounds; ship only up to the best one
+        booster = booster[:best_iteration + 1]
+
+    metrics = evaluate(booster, dval) if dval is not None else {}
+
+    version = started.strftime('%Y%m%d%H%M%S')
+    version_dir = os.path.join(model_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+    booster.save_model(os.path.join(version_dir, 'model.json'))
+
+    metadata = {
+        'version': version,
+        'created_at': started.isoformat(),
+        'xgboost_version': xgb.__version__,
+        'feature_columns': FEATURE_COLUMNS,
+        'target': 'dropped_out',
+        'params': params,
+        'num_boosted_rounds': booster.num_boosted_rounds(),
+        'best_iteration': best_iteration,
+        'resumed_from': resumed_from,
+        'training_rows': train_rows,
+        'validation_rows': val_rows,
+        'training_seconds': elapsed,
+        'metrics': metrics
+    }
+    with open(os.path.join(version_dir, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    if not args.no_promote:
+        # Write-then-rename so the app never reads a half-written pointer
+        tmp_path = os.path.join(model_dir, 'LATEST.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(model_dir, 'LATEST'))
+
+    print(f"\n✅ Trained model {version} in {elapsed:.1f}s -> {version_dir}")
+    for name, value in metrics.items():
+        print(f"   • {name}: {value:.4f}")
+    return version
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the dropout model from historical outcomes in the database")
+    parser.add_argument('--output-dir', help="Model directory (defaults to MODEL_DIR)")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="Rows fetched from the database per chunk")
+    parser.add_argument('--rounds', type=int, default=300, help="Boosting rounds to add")
+    parser.add_argument('--learning-rate', type=float, default=0.1)
+    parser.add_argument('--max-depth', type=int, default=6)
+    parser.add_argument('--max-bin', type=int, default=256)
+    parser.add_argument('--subsample', type=float, default=0.8)
+    parser.add_argument('--n-jobs', type=int, default=os.cpu_count(), help="Threads used by XGBoost")
+    parser.add_argument('--holdout-mod', type=int, default=10,
+                        help="Students with student_id %% N == 0 form the validation set")
+    parser.add_argument('--early-stopping', type=int, default=20, help="Stop after N rounds without improvement (0 disables)")
+    parser.add_argument('--resume-from', metavar='VERSION',
+                        help="Continue boosting from an existing model version, or 'latest'")
+    parser.add_argument('--no-promote', action='store_true', help="Do not point LATEST at the new model")
+    parser.add_argument('--verbose-eval', type=int, default=25, help="Print evaluation every N rounds")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    arguments = parse_args()
+    with app.app_context():
+        train(arguments)